@@ -4,10 +4,12 @@
 """
 
 import logging
+import signal
 import sys
 import os
-import time  # Добавил этот импорт
-from datetime import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from logging.handlers import TimedRotatingFileHandler
 
 # Добавляем src в путь импорта
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
@@ -20,8 +22,9 @@ from monitor import MedicalMonitor, StateManager
 from scheduler import MonitorScheduler
 
 
-def setup_logging(log_dir: str, log_level: str = "INFO"):
-    """Настройка логирования"""
+def setup_logging(system_config, log_level: str = "INFO"):
+    """Настройка логирования (файл ротируется в полночь, хранится max_log_files файлов)"""
+    log_dir = system_config.log_dir
     os.makedirs(log_dir, exist_ok=True)
 
     # Формат для логов
@@ -37,8 +40,11 @@ def setup_logging(log_dir: str, log_level: str = "INFO"):
         format=log_format,
         datefmt=date_format,
         handlers=[
-            logging.FileHandler(
-                os.path.join(log_dir, f"medical_monitor_{datetime.now().strftime('%Y%m%d')}.log")
+            TimedRotatingFileHandler(
+                os.path.join(log_dir, "medical_monitor.log"),
+                when="midnight",
+                backupCount=system_config.max_log_files,
+                encoding="utf-8"
             ),
             logging.StreamHandler(sys.stdout)
         ]
@@ -48,15 +54,32 @@ def setup_logging(log_dir: str, log_level: str = "INFO"):
 def create_monitors(config_manager, system_config):
     """Создание мониторов из конфигурации"""
     monitors = []
+    monitor_configs = list(config_manager.monitors)
+
+    # Устаревшие данные не должны доживать до следующей плановой проверки,
+    # иначе она строится по данным предыдущей (с запасом на время загрузки листа)
+    cache_ttl = system_config.sheets_cache_ttl
+    stale_ttl = system_config.sheets_stale_ttl
+    if monitor_configs:
+        max_stale_ttl = max(0, min(c.check_interval for c in monitor_configs) * 60 - cache_ttl - 30)
+        if stale_ttl > max_stale_ttl:
+            logging.warning(f"sheets_cache_ttl + sheets_stale_ttl не меньше интервала проверки, "
+                            f"sheets_stale_ttl уменьшен с {stale_ttl} до {max_stale_ttl} сек")
+            stale_ttl = max_stale_ttl
 
     # Инициализация клиента Google Sheets
     try:
-        google_client = GoogleSheetsClient("credentials.json")
+        google_client = GoogleSheetsClient(
+            "credentials.json",
+            cache_ttl=cache_ttl,
+            stale_ttl=stale_ttl,
+            cache_dir=system_config.cache_dir
+        )
     except Exception as e:
         logging.error(f"Не удалось инициализировать Google Sheets клиент: {e}")
         return []
 
-    for monitor_config in config_manager.monitors:
+    for monitor_config in monitor_configs:
         try:
             # Инициализация Telegram бота
             telegram_bot = TelegramBot(
@@ -64,11 +87,6 @@ def create_monitors(config_manager, system_config):
                 monitor_config.telegram_chat_ids
             )
 
-            # Тестирование подключения к Telegram
-            if not telegram_bot.test_connection():
-                logging.error(f"Не удалось подключиться к Telegram для монитора {monitor_config.name}")
-                continue
-
             # Инициализация менеджера состояния
             state_manager = StateManager(
                 system_config.state_dir,
@@ -87,9 +105,6 @@ def create_monitors(config_manager, system_config):
             monitors.append(monitor)
             logging.info(f"✅ Монитор '{monitor_config.name}' успешно создан")
 
-            # Отправка тестового сообщения
-            telegram_bot.send_test_message()
-
         except Exception as e:
             logging.error(f"❌ Ошибка создания монитора {monitor_config.name}: {e}")
             continue
@@ -97,6 +112,36 @@ def create_monitors(config_manager, system_config):
     return monitors
 
 
+def probe_monitors(monitors):
+    """
+    Проверка подключения к Telegram и отправка тестовых сообщений.
+
+    Выполняется параллельно для всех мониторов; мониторы без связи с Telegram отключаются.
+
+    Returns:
+        int: Количество рабочих мониторов
+    """
+
+    def probe(monitor):
+        if not monitor.telegram_bot.test_connection():
+            logging.error(f"Не удалось подключиться к Telegram для монитора {monitor.config.name}, монитор отключен")
+            monitor.enabled = False
+            return False
+        return True
+
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        connected = list(executor.map(probe, monitors))
+
+    # Тестовые сообщения идут через общую очередь отправки, ждём их только в конце
+    test_messages = []
+    for monitor, is_connected in zip(monitors, connected):
+        if is_connected:
+            test_messages.extend(monitor.telegram_bot.send_test_message_async())
+    wait(test_messages)
+
+    return sum(connected)
+
+
 def main():
     """Основная функция"""
     print("\n" + "=" * 60)
@@ -110,7 +155,7 @@ def main():
         sys.exit(1)
 
     # Настройка логирования
-    setup_logging(config_manager.system_config.log_dir, "INFO")
+    setup_logging(config_manager.system_config, "INFO")
 
     # Создание мониторов
     monitors = create_monitors(config_manager, config_manager.system_config)
@@ -121,14 +166,26 @@ def main():
 
     print(f"\n✅ Создано {len(monitors)} мониторов")
 
+    # Проверка связи с Telegram до первой проверки: иначе монитор без связи запишет
+    # сотрудников в состояние, а уведомления о них так и не будут отправлены
+    active_count = probe_monitors(monitors)
+    if not active_count:
+        print("❌ Нет рабочих мониторов для запуска")
+        sys.exit(1)
+    print(f"✅ Связь с Telegram подтверждена для {active_count} из {len(monitors)} мониторов")
+    active_monitors = [monitor for monitor in monitors if monitor.enabled]
+
     # Тестирование первоначальной проверки
     print("\n" + "=" * 60)
     print("🧪 ТЕСТИРОВАНИЕ ПЕРВОНАЧАЛЬНОЙ ПРОВЕРКИ")
     print("=" * 60)
 
-    for i, monitor in enumerate(monitors, 1):
+    # Мониторы проверяются параллельно: каждая проверка в основном ждёт сеть
+    with ThreadPoolExecutor(max_workers=min(16, len(active_monitors))) as executor:
+        results = list(executor.map(lambda monitor: monitor.check_medical_records(), active_monitors))
+
+    for i, (monitor, result) in enumerate(zip(active_monitors, results), 1):
         print(f"\n{i}. Тест монитора: {monitor.config.name}")
-        result = monitor.check_medical_records()
 
         if result.get('status') == 'success':
             print(f"   ✅ Проверка успешна: {result['total_employees']} сотрудников")
@@ -140,26 +197,31 @@ def main():
     print("🔄 ЗАПУСК АВТОМАТИЧЕСКОГО МОНИТОРИНГА")
     print("=" * 60 + "\n")
 
+    stop_event = threading.Event()
+
+    def handle_stop_signal(signum, frame):
+        print("\n\n⚠️ Получен сигнал прерывания")
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, handle_stop_signal)
+    signal.signal(signal.SIGTERM, handle_stop_signal)
+
     scheduler = MonitorScheduler(monitors)
 
     try:
         scheduler.start()
 
-        # Основной цикл программы
-        while True:
-            try:
-                time.sleep(1)
-            except KeyboardInterrupt:
-                print("\n\n⚠️ Получен сигнал прерывания")
-                break
-            except Exception as e:
-                logging.error(f"Ошибка в основном цикле: {e}")
+        # Ожидание сигнала остановки (SIGINT/SIGTERM)
+        stop_event.wait()
 
     except Exception as e:
         logging.error(f"Критическая ошибка: {e}")
     finally:
         print("\n🛑 Остановка системы...")
         scheduler.stop()
+        # Дописываем на диск состояние, ожидающее записи
+        for monitor in monitors:
+            monitor.state_manager.close(timeout=5)
         print("✅ Система остановлена")
 
 
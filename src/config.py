@@ -1,10 +1,17 @@
-import json
 import os
 from dataclasses import dataclass, field
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional
 from datetime import time
 import logging
 
+import json_codec
+
+
+# Кэш данных листа по умолчанию, сек: свежие данные и окно отдачи устаревших.
+# Сумма должна быть меньше минимального интервала проверки
+SHEETS_CACHE_TTL = 60
+SHEETS_STALE_TTL = 300
+
 
 @dataclass
 class MonitorConfig:
@@ -38,9 +45,37 @@ class SystemConfig:
     """Системная конфигурация"""
     state_dir: str = "data/state"
     log_dir: str = "data/logs"
+    cache_dir: str = "data/cache"
     max_log_files: int = 7
     retry_attempts: int = 3
     retry_delay: int = 5
+    sheets_cache_ttl: int = SHEETS_CACHE_TTL
+    sheets_stale_ttl: int = SHEETS_STALE_TTL
+
+
+class LazyMonitorsView:
+    """Конфигурации мониторов, создаваемые при первом обращении"""
+
+    def __init__(self, raw_monitors: List[Dict[str, Any]]):
+        self._raw_monitors = raw_monitors
+        self._configs: List[Optional[MonitorConfig]] = [None] * len(raw_monitors)
+
+    def __len__(self) -> int:
+        return len(self._raw_monitors)
+
+    def __getitem__(self, index: int) -> MonitorConfig:
+        config = self._configs[index]
+        if config is None:
+            config = self._configs[index] = MonitorConfig(**self._raw_monitors[index])
+        return config
+
+    def __iter__(self) -> Iterator[MonitorConfig]:
+        """Перебор конфигураций; ошибочные записи пропускаются"""
+        for index, monitor_data in enumerate(self._raw_monitors):
+            try:
+                yield self[index]
+            except Exception as e:
+                logging.error(f"Ошибка конфигурации монитора {monitor_data.get('name', index)}: {e}")
 
 
 class ConfigManager:
@@ -48,19 +83,28 @@ class ConfigManager:
 
     def __init__(self, config_path: str = "config/monitors_config.json"):
         self.config_path = config_path
-        self.monitors: List[MonitorConfig] = []
+        self._raw_monitors: List[Dict[str, Any]] = []
+        self._monitors = LazyMonitorsView(self._raw_monitors)
         self.system_config = SystemConfig()
 
+    @property
+    def monitors(self) -> LazyMonitorsView:
+        """Конфигурации мониторов (создаются при первом обращении)"""
+        return self._monitors
+
+    def __iter__(self) -> Iterator[MonitorConfig]:
+        return iter(self._monitors)
+
     def load(self):
         """Загрузка конфигурации из файла"""
         try:
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                config_data = json.load(f)
+            with open(self.config_path, 'rb') as f:
+                raw_config = f.read()
+            config_data = json_codec.loads(raw_config)
 
-            # Загружаем конфигурацию мониторов
-            for monitor_data in config_data.get("monitors", []):
-                monitor = MonitorConfig(**monitor_data)
-                self.monitors.append(monitor)
+            # Конфигурации мониторов разбираются при первом обращении
+            self._raw_monitors = config_data.get("monitors", [])
+            self._monitors = LazyMonitorsView(self._raw_monitors)
 
             # Загружаем системную конфигурацию
             system_data = config_data.get("system", {})
@@ -69,6 +113,7 @@ class ConfigManager:
             # Создаем необходимые директории
             os.makedirs(self.system_config.state_dir, exist_ok=True)
             os.makedirs(self.system_config.log_dir, exist_ok=True)
+            os.makedirs(self.system_config.cache_dir, exist_ok=True)
 
             logging.info(f"Загружено {len(self.monitors)} мониторов")
             return True
@@ -1,7 +1,50 @@
 import gspread
+from gspread.urls import DRIVE_FILES_API_V3_URL, SPREADSHEET_VALUES_BATCH_URL
 from google.oauth2.service_account import Credentials
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Set, Tuple, Callable
+from dataclasses import dataclass, field
+from calendar import monthrange
+from datetime import date
 import logging
+import os
+import random
+import re
+import threading
+import time
+
+import http_pool
+from config import SHEETS_CACHE_TTL, SHEETS_STALE_TTL
+import json_codec
+
+# Дата вида ДД.ММ.ГГГГ: разделитель '.', '/' или '-' (один и тот же), год из 2 или 4 цифр
+_DATE_RE = re.compile(r"^(\d{1,2})([./-])(\d{1,2})\2(\d{4}|\d{2})$")
+
+
+@dataclass
+class SheetTable:
+    """Данные листа, разложенные по столбцам"""
+    sheet: str
+    headers: List[str] = field(default_factory=list)
+    columns: Dict[str, List[str]] = field(default_factory=dict)
+    rows: List[int] = field(default_factory=list)  # Номера строк в таблице
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def record(self, index: int) -> Dict[str, str]:
+        """Строка таблицы в виде словаря {заголовок: значение}"""
+        return {header: self.columns[header][index] for header in self.headers}
+
+
+@dataclass(slots=True)
+class Employee:
+    """Нормализованные данные сотрудника"""
+    name: str
+    position: str
+    days_left: int
+    has_medical_book: bool
+    raw_days_value: str
+    row: int  # Номер строки в таблице
 
 
 class GoogleSheetsClient:
@@ -12,207 +55,455 @@ class GoogleSheetsClient:
         'https://www.googleapis.com/auth/drive'
     ]
 
-    def __init__(self, credentials_file: str = "credentials.json"):
+    NAME_FIELDS = ['ФИО', 'Имя', 'Сотрудник', 'Name', 'медкнижка']
+    DAYS_FIELDS = ['Срок', 'срок', 'Days', 'days', 'Дней', 'Осталось']
+    POSITION_FIELDS = ['Должность', 'Position', 'Role', 'Должн']
+
+    # Задержки повторов при превышении квоты (429), сек; к каждой добавляется до 1 сек
+    RETRY_DELAYS = (1, 2, 4, 8)
+
+    def __init__(self, credentials_file: str = "credentials.json",
+                 cache_ttl: int = SHEETS_CACHE_TTL, stale_ttl: int = SHEETS_STALE_TTL,
+                 cache_dir: Optional[str] = None):
+        """
+        Args:
+            credentials_file: Файл сервисного аккаунта
+            cache_ttl: Сколько секунд данные листа считаются свежими
+            stale_ttl: Сколько секунд после cache_ttl отдаём устаревшие данные,
+                обновляя их в фоне
+            cache_dir: Папка для сохранения данных листов между запусками (None - не сохранять)
+        """
         self.credentials_file = credentials_file
-        self.client = None
+        self.cache_ttl = cache_ttl
+        self.stale_ttl = stale_ttl
+        self.cache_dir = cache_dir
+        self._credentials = None
+
+        # Клиент gspread (и его сессия requests) у каждого потока свой
+        self._local = threading.local()
+
+        # Кэш листов: (spreadsheet_id, worksheet_name) ->
+        # (время последней сверки, modifiedTime, данные, дата последней полной загрузки)
+        self._cache: Dict[Tuple[str, str], Tuple[float, Optional[str], SheetTable, Optional[date]]] = {}
+        self._cache_lock = threading.Lock()
+        self._refreshing: Set[Tuple[str, str]] = set()
+
+        # Фактические названия листов, если запрошенный лист не найден
+        self._worksheet_titles: Dict[Tuple[str, str], str] = {}
+
+        # Стандартные поля, найденные в листе, по набору заголовков
+        self._schemas: Dict[Tuple[str, ...], Dict[str, List[str]]] = {}
+
         self._authenticate()
+        self._load_disk_cache()
 
     def _authenticate(self):
         """Аутентификация в Google Sheets"""
         try:
-            creds = Credentials.from_service_account_file(
+            self._credentials = Credentials.from_service_account_file(
                 self.credentials_file,
                 scopes=self.SCOPES
             )
-            self.client = gspread.authorize(creds)
+            self._local.client = self._create_client()
             logging.info("✅ Успешная аутентификация в Google Sheets")
         except Exception as e:
             logging.error(f"❌ Ошибка аутентификации: {e}")
             raise
 
-    def get_worksheet_data(self, spreadsheet_id: str, worksheet_name: str = "Лист1") -> List[Dict[str, Any]]:
-        """Получение данных из указанного листа"""
+    def _create_client(self) -> gspread.Client:
+        client = gspread.authorize(self._credentials)
+        # Авторизованная сессия gspread работает через общий пул соединений
+        http_pool.mount(client.session)
+        return client
+
+    @property
+    def client(self) -> gspread.Client:
+        """Клиент gspread текущего потока"""
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self._create_client()
+        return client
+
+    def get_worksheet_data(self, spreadsheet_id: str, worksheet_name: str = "Лист1",
+                           revalidate: bool = False) -> SheetTable:
+        """
+        Получение данных из указанного листа с кэшированием.
+
+        Свежие данные (моложе cache_ttl) отдаются из кэша. Устаревшие, но не старше
+        cache_ttl + stale_ttl, отдаются сразу, а обновление идёт в фоновом потоке.
+        В остальных случаях таблица перепроверяется синхронно.
+
+        При revalidate=True лист всегда загружается заново: формулы вроде TODAY()
+        пересчитываются без изменения modifiedTime.
+        """
+        key = (spreadsheet_id, worksheet_name)
+        with self._cache_lock:
+            entry = self._cache.get(key)
+
+        if entry is not None:
+            age = time.monotonic() - entry[0]
+            if age < self.cache_ttl:
+                return entry[2]
+            if not revalidate and age < self.cache_ttl + self.stale_ttl:
+                self._refresh_in_background(key, entry)
+                return entry[2]
+
+        return self._refresh(key, entry, full_fetch=revalidate)
+
+    def _refresh(self, key: Tuple[str, str], entry, full_fetch: bool = False) -> SheetTable:
+        """
+        Перепроверка листа и обновление кэша
+
+        Неизменный modifiedTime позволяет не загружать лист только в течение дня его
+        последней полной загрузки: значения формул от текущей даты меняются без правки таблицы.
+        """
+        spreadsheet_id, worksheet_name = key
+        fetched_on = date.today()
         try:
-            # Открываем таблицу
-            spreadsheet = self.client.open_by_key(spreadsheet_id)
+            modified_time = self._get_modified_time(spreadsheet_id)
+
+            if (not full_fetch and entry is not None and modified_time is not None
+                    and modified_time == entry[1] and entry[3] == fetched_on):
+                # Таблица не менялась - полная загрузка не нужна
+                logging.debug("Таблица %s не изменилась, используем кэш", spreadsheet_id)
+                data = entry[2]
+            else:
+                data = self._with_backoff(self._fetch_worksheet_data, spreadsheet_id, worksheet_name)
+                if modified_time is not None:
+                    self._save_disk_cache(key, modified_time, data, fetched_on)
 
-            # Получаем список всех листов для информации
-            worksheets = spreadsheet.worksheets()
-            logging.debug(f"Найдено листов: {[ws.title for ws in worksheets]}")
+        except Exception as e:
+            if entry is not None:
+                logging.warning(f"Ошибка обновления данных из Google Sheets, используем кэш: {e}")
+                return entry[2]
+            logging.error(f"Ошибка получения данных из Google Sheets: {e}")
+            return SheetTable(worksheet_name)
 
-            # Получаем указанный лист
-            try:
-                worksheet = spreadsheet.worksheet(worksheet_name)
-            except gspread.exceptions.WorksheetNotFound:
-                logging.warning(f"Лист '{worksheet_name}' не найден, используем первый лист")
-                worksheet = worksheets[0]
-                worksheet_name = worksheet.title
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic(), modified_time, data, fetched_on)
+        return data
 
-            # Получаем все данные
-            all_values = worksheet.get_all_values()
+    def _refresh_in_background(self, key: Tuple[str, str], entry):
+        """Запуск фонового обновления, если оно ещё не идёт"""
+        with self._cache_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
 
-            if len(all_values) < 2:
-                logging.warning("Таблица содержит меньше 2 строк")
-                return []
+        threading.Thread(target=self._background_refresh, args=(key, entry), daemon=True).start()
 
-            # Парсим заголовки и данные
-            headers = [h.strip() if h.strip() else f"Column_{i + 1}"
-                       for i, h in enumerate(all_values[0])]
+    def _background_refresh(self, key: Tuple[str, str], entry):
+        try:
+            self._refresh(key, entry)
+        finally:
+            with self._cache_lock:
+                self._refreshing.discard(key)
+
+    def _load_disk_cache(self):
+        """
+        Загрузка сохранённых данных листов.
+
+        Записи считаются устаревшими: при первом обращении сверяется modifiedTime,
+        и если таблица не менялась и лист полностью загружался сегодня, он не загружается заново.
+        """
+        if not self.cache_dir or not os.path.isdir(self.cache_dir):
+            return
+
+        for file_name in os.listdir(self.cache_dir):
+            if not file_name.endswith('.json'):
+                continue
 
-            data = []
-            for row_idx, row in enumerate(all_values[1:], start=2):
-                # Пропускаем полностью пустые строки
-                if not any(cell.strip() for cell in row):
-                    continue
+            path = os.path.join(self.cache_dir, file_name)
+            try:
+                with open(path, 'rb') as f:
+                    raw_cache = f.read()
+                cached = json_codec.loads(raw_cache)
 
-                record = {}
-                for col_idx, (header, value) in enumerate(zip(headers, row)):
-                    if col_idx < len(row):
-                        record[header] = value.strip() if value else ""
+                table = SheetTable(cached['sheet'], cached['headers'], cached['columns'], cached['rows'])
+                key = (cached['spreadsheet_id'], cached['worksheet_name'])
+                # Без даты полной загрузки (старый формат) лист при первом обращении загружается заново
+                fetched_on = cached.get('fetched_on')
+                fetched_on = date.fromisoformat(fetched_on) if fetched_on else None
+                self._cache[key] = (float('-inf'), cached['modified_time'], table, fetched_on)
 
-                # Добавляем метаданные
-                record['_row'] = row_idx
-                record['_sheet'] = worksheet_name
+            except Exception as e:
+                logging.warning(f"Не удалось загрузить кэш листа {path}: {e}")
+
+        if self._cache:
+            logging.info(f"Загружен кэш {len(self._cache)} листов")
+
+    def _save_disk_cache(self, key: Tuple[str, str], modified_time: str, table: SheetTable, fetched_on: date):
+        """Сохранение данных листа на диск (через временный файл)"""
+        if not self.cache_dir:
+            return
+
+        spreadsheet_id, worksheet_name = key
+        cached = {
+            'spreadsheet_id': spreadsheet_id,
+            'worksheet_name': worksheet_name,
+            'modified_time': modified_time,
+            'fetched_on': fetched_on.isoformat(),
+            'sheet': table.sheet,
+            'headers': table.headers,
+            'columns': table.columns,
+            'rows': table.rows
+        }
 
-                data.append(record)
+        file_name = re.sub(r'[^\w-]', '_', f"{spreadsheet_id}_{worksheet_name}") + '.json'
+        path = os.path.join(self.cache_dir, file_name)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            content = json_codec.dumps(cached)
+            with open(path + '.tmp', 'wb') as f:
+                f.write(content)
+            os.replace(path + '.tmp', path)
+        except Exception as e:
+            logging.warning(f"Не удалось сохранить кэш листа {path}: {e}")
 
-            logging.info(f"Получено {len(data)} записей из листа '{worksheet_name}'")
-            return data
+    def _get_modified_time(self, spreadsheet_id: str) -> Optional[str]:
+        """Время последнего изменения таблицы из Drive API (None, если недоступно)"""
+        try:
+            response = self._with_backoff(
+                self.client.request,
+                "get",
+                f"{DRIVE_FILES_API_V3_URL}/{spreadsheet_id}",
+                params={"fields": "modifiedTime", "supportsAllDrives": True}
+            )
+            return response.json().get("modifiedTime")
+        except gspread.exceptions.APIError as e:
+            if self._is_rate_limited(e):
+                raise
+            # Drive API может быть не включен в проекте - тогда просто читаем лист целиком
+            logging.debug(f"Не удалось получить modifiedTime таблицы {spreadsheet_id}: {e}")
+            return None
+
+    def _with_backoff(self, func, *args, **kwargs):
+        """Вызов с экспоненциальной задержкой при превышении квоты (429)"""
+        for delay in self.RETRY_DELAYS:
+            try:
+                return func(*args, **kwargs)
+            except gspread.exceptions.APIError as e:
+                if not self._is_rate_limited(e):
+                    raise
+                wait = delay + random.uniform(0, 1)
+                logging.warning(f"Превышена квота Google Sheets API, повтор через {wait:.1f} сек")
+                time.sleep(wait)
+
+        return func(*args, **kwargs)
+
+    @staticmethod
+    def _is_rate_limited(error: gspread.exceptions.APIError) -> bool:
+        response = getattr(error, 'response', None)
+        return response is not None and response.status_code == 429
+
+    def _fetch_worksheet_data(self, spreadsheet_id: str, worksheet_name: str) -> SheetTable:
+        """Загрузка данных листа из Google Sheets"""
+        key = (spreadsheet_id, worksheet_name)
+        worksheet_name = self._worksheet_titles.get(key, worksheet_name)
 
-        except Exception as e:
-            logging.error(f"Ошибка получения данных из Google Sheets: {e}")
-            return []
+        try:
+            all_values = self._batch_get_values(spreadsheet_id, worksheet_name)
+        except gspread.exceptions.APIError as e:
+            # 400 - диапазон не разобран, т.е. листа с таким названием нет
+            if getattr(e, 'response', None) is None or e.response.status_code != 400:
+                raise
+            worksheet_name, all_values = self._get_worksheet_values_fallback(spreadsheet_id, worksheet_name)
+            self._worksheet_titles[key] = worksheet_name
+
+        if len(all_values) < 2:
+            logging.warning("Таблица содержит меньше 2 строк")
+            return SheetTable(worksheet_name)
+
+        # Парсим заголовки и данные
+        headers = [h.strip() if h.strip() else f"Column_{i + 1}"
+                   for i, h in enumerate(all_values[0])]
+
+        # Номера строк в таблице, полностью пустые строки пропускаем
+        rows = [row_idx for row_idx, row in enumerate(all_values[1:], start=2)
+                if any(map(str.strip, row))]
+
+        # Индекс столбца по заголовку (при повторе заголовка остаётся последний столбец)
+        header_idx = {header: col_idx for col_idx, header in enumerate(headers)}
+
+        # Транспонируем один раз и чистим значения целыми столбцами
+        raw_columns = list(zip(*(all_values[row_idx - 1] for row_idx in rows))) or [()] * len(headers)
+        columns = {header: list(map(str.strip, raw_columns[col_idx]))
+                   for header, col_idx in header_idx.items()}
+
+        logging.info(f"Получено {len(rows)} записей из листа '{worksheet_name}'")
+        return SheetTable(worksheet_name, headers, columns, rows)
+
+    def _batch_get_values(self, spreadsheet_id: str, worksheet_name: str) -> List[List[str]]:
+        """Значения листа одним запросом values:batchGet (без загрузки метаданных таблицы)"""
+        sheet_range = "'{}'".format(worksheet_name.replace("'", "''"))
+        response = self.client.request(
+            "get",
+            SPREADSHEET_VALUES_BATCH_URL % spreadsheet_id,
+            params={"ranges": [sheet_range], "majorDimension": "ROWS"}
+        )
+
+        value_ranges = response.json().get("valueRanges", [])
+        values = value_ranges[0].get("values", []) if value_ranges else []
+
+        # API не возвращает пустые ячейки в конце строк - дополняем, как get_all_values()
+        width = max((len(row) for row in values), default=0)
+        return [row + [""] * (width - len(row)) for row in values]
+
+    def _get_worksheet_values_fallback(self, spreadsheet_id: str, worksheet_name: str) -> Tuple[str, List[List[str]]]:
+        """Запасной путь, если лист не найден: данные первого листа таблицы"""
+        spreadsheet = self.client.open_by_key(spreadsheet_id)
 
-    def normalize_employee_data(self, raw_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Нормализация данных о сотрудниках"""
-        normalized = []
+        try:
+            worksheet = spreadsheet.worksheet(worksheet_name)
+        except gspread.exceptions.WorksheetNotFound:
+            logging.warning(f"Лист '{worksheet_name}' не найден, используем первый лист")
+            worksheet = spreadsheet.sheet1
 
-        for record in raw_data:
-            try:
-                # Поиск ФИО в различных полях
-                name = self._extract_name(record)
+        return worksheet.title, worksheet.get_all_values()
+
+    def normalize_employee_data(self, table: SheetTable) -> List[Employee]:
+        """
+        Нормализация данных о сотрудниках.
+
+        Стандартные поля разбираются сразу по целым столбцам; построчный поиск
+        по всем полям выполняется только для строк, где стандартные поля пусты.
+        """
+        schema = self._resolve_schema(table.headers)
+        names = self._coalesce_columns(table, schema['name'], self._is_name_value)
+        days_values = self._coalesce_columns(table, schema['days'])
+        positions = self._coalesce_columns(table, schema['position'], lambda value: len(value) < 50)
 
-                # Поиск дней до истечения срока
-                days_info = self._extract_days_info(record)
+        # Одна дата на весь проход: сроки всех строк считаются от одного "сегодня"
+        today = date.today()
 
-                # Поиск должности
-                position = self._extract_position(record)
+        normalized = []
 
-                employee = {
-                    'name': name,
-                    'position': position,
-                    'days_left': days_info['days_left'],
-                    'has_medical_book': days_info['has_medical_book'],
-                    'raw_days_value': days_info['raw_value'],
-                    'original_data': record
-                }
+        for i, row in enumerate(table.rows):
+            try:
+                name = names[i]
+                raw_value = days_values[i]
+                if not name or not raw_value:
+                    # Если в стандартных полях пусто, ищем по всем полям строки
+                    record = table.record(i)
+                    name = name or self._find_name(record)
+                    raw_value = raw_value or self._find_days_value(record)
+
+                days_info = self._parse_days_value(raw_value, today)
+
+                employee = Employee(
+                    name=name,
+                    position=positions[i],
+                    days_left=days_info['days_left'],
+                    has_medical_book=days_info['has_medical_book'],
+                    raw_days_value=raw_value,
+                    row=row
+                )
 
                 normalized.append(employee)
 
             except Exception as e:
-                logging.warning(f"Ошибка нормализации записи {record.get('ФИО', 'Unknown')}: {e}")
+                logging.warning(f"Ошибка нормализации записи в строке {row}: {e}")
                 continue
 
         return normalized
 
-    def _extract_name(self, record: Dict[str, Any]) -> str:
-        """Извлечение имени сотрудника"""
-        name_fields = ['ФИО', 'Имя', 'Сотрудник', 'Name', 'медкнижка']
+    def _resolve_schema(self, headers: List[str]) -> Dict[str, List[str]]:
+        """Стандартные поля, которые есть среди заголовков листа (вычисляется один раз на набор заголовков)"""
+        key = tuple(headers)
+        schema = self._schemas.get(key)
+
+        if schema is None:
+            present = set(headers)
+            schema = {
+                'name': [f for f in self.NAME_FIELDS if f in present],
+                'days': [f for f in self.DAYS_FIELDS if f in present],
+                'position': [f for f in self.POSITION_FIELDS if f in present]
+            }
+            self._schemas[key] = schema
+
+        return schema
+
+    @staticmethod
+    def _coalesce_columns(table: SheetTable, fields: List[str],
+                          accept: Optional[Callable[[str], bool]] = None) -> List[str]:
+        """Первое подходящее непустое значение из перечисленных столбцов для каждой строки"""
+        if not fields:
+            return [""] * len(table)
+
+        # Обычный случай - в листе одно такое поле
+        column = table.columns[fields[0]]
+        if accept is None:
+            result = list(column)
+        else:
+            result = [value if value and accept(value) else "" for value in column]
+
+        for field_name in fields[1:]:
+            for i, value in enumerate(table.columns[field_name]):
+                if value and not result[i] and (accept is None or accept(value)):
+                    result[i] = value
+
+        return result
 
-        for field in name_fields:
-            if field in record and record[field]:
-                value = record[field].strip()
-                if value and not self._looks_like_date(value) and not value.replace('.', '').isdigit():
-                    return value
+    def _is_name_value(self, value: str) -> bool:
+        """Значение похоже на имя (не дата и не число)"""
+        return not self._looks_like_date(value) and not value.replace('.', '').isdigit()
 
-        # Если не нашли в стандартных полях, ищем первое непустое поле
+    def _find_name(self, record: Dict[str, str]) -> str:
+        """Поиск имени сотрудника в произвольных полях"""
         for key, value in record.items():
             if (value and key not in ['Срок', 'Days', 'Дней', 'Осталось'] and
-                    not self._looks_like_date(value) and
-                    not value.replace('.', '').isdigit() and
+                    self._is_name_value(value) and
                     len(value) > 3 and len(value) < 50):
                 return value
 
         return "Неизвестный сотрудник"
 
-    def _extract_days_info(self, record: Dict[str, Any]) -> Dict[str, Any]:
-        """Извлечение информации о днях"""
-        days_fields = ['Срок', 'срок', 'Days', 'days', 'Дней', 'Осталось']
+    @staticmethod
+    def _find_days_value(record: Dict[str, str]) -> str:
+        """Поиск числового значения дней в произвольных полях"""
+        for value in record.values():
+            if value and value.lstrip('-').replace('.', '', 1).isdigit():
+                return value
+
+        return ""
 
-        raw_value = ""
+    def _parse_days_value(self, raw_value: str, today: date) -> Dict[str, Any]:
+        """Разбор значения срока медкнижки"""
         has_medical_book = True
         days_left = 0
 
-        # Поиск в стандартных полях
-        for field in days_fields:
-            if field in record and record[field]:
-                raw_value = str(record[field]).strip()
-                break
-
-        # Если не нашли, ищем числовое значение в любом поле
-        if not raw_value:
-            for key, value in record.items():
-                if value and str(value).strip().lstrip('-').replace('.', '', 1).isdigit():
-                    raw_value = str(value).strip()
-                    break
-
-        # Обработка значения
         if not raw_value or raw_value.lower() in ['нет', 'н', 'no', 'none', '']:
             has_medical_book = False
             days_left = -999  # Специальное значение для отсутствия медкнижки
         elif raw_value.replace('-', '', 1).isdigit():
             days_left = int(raw_value)
-        elif self._looks_like_date(raw_value):
+        elif (parsed_date := self._looks_like_date(raw_value)):
             # Если это дата, вычисляем разницу в днях
-            days_left = self._calculate_days_from_date(raw_value)
+            days_left = self._calculate_days_from_date(*parsed_date, today)
         else:
             # Неизвестный формат
             has_medical_book = False
             days_left = -999
 
         return {
-            'raw_value': raw_value,
             'days_left': days_left,
             'has_medical_book': has_medical_book
         }
 
-    def _extract_position(self, record: Dict[str, Any]) -> str:
-        """Извлечение должности"""
-        position_fields = ['Должность', 'Position', 'Role', 'Должн']
-
-        for field in position_fields:
-            if field in record and record[field]:
-                value = record[field].strip()
-                if value and len(value) < 50:
-                    return value
+    def _looks_like_date(self, value: str) -> Optional[Tuple[int, int, int]]:
+        """Проверка, похоже ли значение на дату: (день, месяц, год) или None"""
+        match = _DATE_RE.match(value)
+        if match is None:
+            return None
 
-        return ""
+        day, _, month, year = match.groups()
+        # Двузначный год считаем годом 21 века
+        return int(day), int(month), int(year) if len(year) == 4 else 2000 + int(year)
 
-    def _looks_like_date(self, value: str) -> bool:
-        """Проверка, похоже ли значение на дату"""
-        date_separators = ['.', '/', '-']
-        for sep in date_separators:
-            if sep in value and len(value.split(sep)) == 3:
-                parts = value.split(sep)
-                if len(parts[0]) in [1, 2] and len(parts[1]) in [1, 2] and len(parts[2]) in [2, 4]:
-                    return True
-        return False
-
-    def _calculate_days_from_date(self, date_str: str) -> int:
+    def _calculate_days_from_date(self, day: int, month: int, year: int, today: date) -> int:
         """Вычисление дней от текущей даты"""
-        try:
-            from datetime import datetime
-            date_formats = ['%d.%m.%Y', '%d/%m/%Y', '%d-%m-%Y']
-
-            for fmt in date_formats:
-                try:
-                    target_date = datetime.strptime(date_str, fmt)
-                    current_date = datetime.now()
-                    days_left = (target_date - current_date).days
-                    return days_left
-                except ValueError:
-                    continue
-
+        if not (year >= 1 and 1 <= month <= 12 and 1 <= day <= monthrange(year, month)[1]):
+            # Несуществующая дата, например 31.02.2025
             return 0
-        except:
-            return 0
\ No newline at end of file
+
+        return (date(year, month, day) - today).days
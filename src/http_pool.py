@@ -0,0 +1,21 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# Повторы при сбоях сервера; 429 не повторяем здесь - квоты обрабатывают сами клиенты
+_retry = Retry(
+    total=5,
+    backoff_factor=0.5,
+    status_forcelist=[500, 502, 503, 504],
+    raise_on_status=False
+)
+
+# Общий адаптер: все сессии, к которым он подключен, используют один пул keep-alive соединений
+adapter = HTTPAdapter(pool_connections=20, pool_maxsize=20, max_retries=_retry)
+
+
+def mount(session: requests.Session) -> requests.Session:
+    """Подключение общего пула соединений к сессии"""
+    session.mount('https://', adapter)
+    return session
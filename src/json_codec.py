@@ -0,0 +1,45 @@
+import json
+from dataclasses import asdict, is_dataclass
+from datetime import datetime
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # orjson необязателен, без него используется стандартный json
+    orjson = None
+
+
+# Время сериализуется с точностью до секунды
+TIMESTAMP_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+
+def _default(value):
+    """Сериализация datetime и dataclass для стандартного json"""
+    if isinstance(value, datetime):
+        return value.strftime(TIMESTAMP_FORMAT)
+    if is_dataclass(value):
+        return asdict(value)
+    raise TypeError(f"Объект типа {type(value).__name__} не сериализуется в JSON")
+
+
+def loads(data: bytes) -> Any:
+    """Разбор JSON (orjson, если установлен)"""
+    return orjson.loads(data) if orjson else json.loads(data)
+
+
+def dumps(value: Any, indent: bool = False) -> bytes:
+    """
+    Сериализация в JSON (UTF-8) без микросекунд в датах
+
+    Args:
+        value: Данные; dataclass и datetime сериализуются напрямую
+        indent: Отступы для удобства чтения, иначе компактная запись
+    """
+    if orjson:
+        option = orjson.OPT_OMIT_MICROSECONDS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(value, option=option)
+
+    return json.dumps(value, ensure_ascii=False, indent=2 if indent else None,
+                      separators=None if indent else (',', ':'), default=_default).encode('utf-8')
@@ -1,13 +1,26 @@
-import pickle
+import functools
 import os
-from datetime import datetime, date
-from typing import List, Dict, Any, Set, Tuple
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime
+from itertools import islice
+from typing import List, Dict, Any, Optional, Tuple
 import logging
-from dataclasses import dataclass, asdict
-import json
+from dataclasses import dataclass
 
+import json_codec
+from google_sheets import Employee
 
-@dataclass
+
+@functools.lru_cache(maxsize=4096)
+def _parse_timestamp(value: str) -> datetime:
+    """Разбор времени из файла состояния; у сотрудников из одной проверки оно совпадает"""
+    return datetime.fromisoformat(value)
+
+
+@dataclass(slots=True)
 class EmployeeState:
     """Состояние сотрудника для отслеживания изменений"""
     name: str
@@ -16,22 +29,21 @@ class EmployeeState:
     has_medical_book: bool
     last_seen: datetime
     first_seen: datetime
-    key: str  # Уникальный ключ для сравнения
+    key: Tuple[str, int, bool]  # Уникальный ключ для сравнения: (ФИО, дней, есть медкнижка)
 
     @classmethod
-    def from_employee_data(cls, employee_data: Dict[str, Any]) -> 'EmployeeState':
+    def from_employee_data(cls, employee_data: Employee, now: datetime) -> 'EmployeeState':
         """Создание состояния из данных сотрудника"""
-        name = employee_data['name']
-        days_left = employee_data['days_left']
-        has_medical_book = employee_data['has_medical_book']
+        name = employee_data.name
+        days_left = employee_data.days_left
+        has_medical_book = employee_data.has_medical_book
 
         # Создаем уникальный ключ
-        key = f"{name}_{days_left}_{has_medical_book}"
+        key = (name, days_left, has_medical_book)
 
-        now = datetime.now()
         return cls(
             name=name,
-            position=employee_data.get('position', ''),
+            position=employee_data.position,
             days_left=days_left,
             has_medical_book=has_medical_book,
             last_seen=now,
@@ -43,26 +55,51 @@ class EmployeeState:
 class StateManager:
     """Менеджер состояния монитора"""
 
+    # Изменения, пришедшие за WRITE_DELAY секунд (но не больше WRITE_BATCH), пишутся на диск одной записью
+    WRITE_DELAY = 0.5
+    WRITE_BATCH = 64
+
+    # Без изменений состояние всё равно сохраняется не реже раза в FORCE_SAVE_INTERVAL секунд (last_seen)
+    FORCE_SAVE_INTERVAL = 600
+
+    # Файл состояния с отступами удобно читать при отладке, но он почти вдвое больше
+    PRETTY_STATE = False
+
     def __init__(self, state_dir: str, monitor_name: str):
         self.state_dir = state_dir
         self.monitor_name = monitor_name
         self.state_file = os.path.join(state_dir, f"{monitor_name}.json")
-        self.employees: Dict[str, EmployeeState] = {}
+        self.employees: Dict[Tuple[str, int, bool], EmployeeState] = {}
+
+        # Есть ли изменения (новые, удаленные сотрудники, должности), еще не поставленные на запись
+        self.dirty = False
+        self._last_save = time.monotonic()
+
+        # Запись состояния на диск выполняется в фоновом потоке
+        self._write_queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name=f"StateWriter-{monitor_name}", daemon=True)
+        self._writer.start()
 
     def load(self) -> bool:
         """Загрузка состояния из файла"""
         try:
             if os.path.exists(self.state_file):
-                with open(self.state_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                with open(self.state_file, 'rb') as f:
+                    raw_state = f.read()
+                data = json_codec.loads(raw_state)
+
+                # Восстанавливаем состояния сотрудников (в старых файлах - словарь по строковому ключу)
+                employees_data = data.get('employees', [])
+                if isinstance(employees_data, dict):
+                    employees_data = employees_data.values()
 
-                # Восстанавливаем состояния сотрудников
                 self.employees = {}
-                for key, emp_data in data.get('employees', {}).items():
+                for emp_data in employees_data:
                     # Конвертируем строки дат обратно в datetime
-                    emp_data['last_seen'] = datetime.fromisoformat(emp_data['last_seen'])
-                    emp_data['first_seen'] = datetime.fromisoformat(emp_data['first_seen'])
-                    self.employees[key] = EmployeeState(**emp_data)
+                    emp_data['last_seen'] = _parse_timestamp(emp_data['last_seen'])
+                    emp_data['first_seen'] = _parse_timestamp(emp_data['first_seen'])
+                    emp_data['key'] = (emp_data['name'], emp_data['days_left'], emp_data['has_medical_book'])
+                    self.employees[emp_data['key']] = EmployeeState(**emp_data)
 
                 logging.info(f"Загружено состояние {len(self.employees)} сотрудников")
                 return True
@@ -73,70 +110,120 @@ class StateManager:
         return False
 
     def save(self) -> bool:
+        """Постановка текущего состояния в очередь на запись в файл (если оно изменилось)"""
+        now = time.monotonic()
+        if not self.dirty and now - self._last_save < self.FORCE_SAVE_INTERVAL:
+            return True
+
+        self._write_queue.put_nowait((datetime.now().replace(microsecond=0), dict(self.employees)))
+        self.dirty = False
+        self._last_save = now
+        return True
+
+    def close(self, timeout: float = None):
+        """Запись ожидающих изменений и остановка фонового потока"""
+        self._write_queue.put(None)
+        self._writer.join(timeout)
+
+    def _write_loop(self):
+        """Фоновая запись: из накопившихся снимков состояния пишется только последний"""
+        while True:
+            snapshot = self._write_queue.get()
+            if snapshot is None:
+                return
+
+            stopping = False
+            pending = 1
+            deadline = time.monotonic() + self.WRITE_DELAY
+            while pending < self.WRITE_BATCH:
+                try:
+                    item = self._write_queue.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                snapshot = item
+                pending += 1
+
+            self._write_state(*snapshot)
+            if stopping:
+                return
+
+    def _write_state(self, last_update: datetime, employees: Dict[Tuple[str, int, bool], EmployeeState]) -> bool:
         """Сохранение состояния в файл"""
         try:
-            # Конвертируем состояния в словарь
-            employees_data = {}
-            for key, employee in self.employees.items():
-                emp_dict = asdict(employee)
-                # Конвертируем datetime в строки для JSON
-                emp_dict['last_seen'] = employee.last_seen.isoformat()
-                emp_dict['first_seen'] = employee.first_seen.isoformat()
-                employees_data[key] = emp_dict
-
+            # Состояния сотрудников (dataclass) и даты сериализуются напрямую
             state_data = {
                 'monitor_name': self.monitor_name,
-                'last_update': datetime.now().isoformat(),
-                'employees': employees_data
+                'last_update': last_update,
+                'employees': list(employees.values())
             }
 
-            with open(self.state_file, 'w', encoding='utf-8') as f:
-                json.dump(state_data, f, ensure_ascii=False, indent=2)
+            content = json_codec.dumps(state_data, indent=self.PRETTY_STATE)
+
+            # Пишем во временный файл и атомарно подменяем: при сбое остаётся прежнее состояние
+            tmp_file = self.state_file + '.tmp'
+            fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                view = memoryview(content)
+                while view:
+                    view = view[os.write(fd, view):]
+            finally:
+                os.close(fd)
+            os.replace(tmp_file, self.state_file)
 
-            logging.debug(f"Состояние сохранено: {len(self.employees)} сотрудников")
+            logging.debug("Состояние сохранено: %s сотрудников", len(employees))
             return True
 
         except Exception as e:
             logging.error(f"Ошибка сохранения состояния: {e}")
             return False
 
-    def update_employees(self, current_employees: List[Dict[str, Any]]) -> Tuple[
+    def update_employees(self, current_employees: List[Employee],
+                         keys: List[Tuple[str, int, bool]] = None) -> Tuple[
         List[EmployeeState], List[EmployeeState]]:
         """
         Обновление состояния сотрудников
 
+        Args:
+            current_employees: Сотрудники из таблицы
+            keys: Готовые ключи сотрудников в том же порядке (если уже посчитаны)
+
         Returns:
             Tuple[List[EmployeeState], List[EmployeeState]]:
                 (новые сотрудники, удаленные сотрудники)
         """
-        current_keys = set()
+        employees = self.employees
+        if keys is None:
+            keys = [(emp.name, emp.days_left, emp.has_medical_book) for emp in current_employees]
+        current_keys = set(keys)
         new_employees = []
+        # Одно время для всех сотрудников проверки
+        now = datetime.now().replace(microsecond=0)
 
         # Обновляем существующих и находим новых
-        for emp_data in current_employees:
-            employee_state = EmployeeState.from_employee_data(emp_data)
-            key = employee_state.key
-            current_keys.add(key)
-
-            if key in self.employees:
-                # Обновляем существующего сотрудника
-                existing = self.employees[key]
-                existing.last_seen = employee_state.last_seen
+        for key, emp_data in zip(keys, current_employees):
+
+            existing = employees.get(key)
+            if existing is not None:
+                # Обновляем существующего сотрудника без создания нового состояния
+                existing.last_seen = now
                 # Можно обновить другие поля если нужно
-                if not existing.position and employee_state.position:
-                    existing.position = employee_state.position
+                if not existing.position and emp_data.position:
+                    existing.position = emp_data.position
+                    self.dirty = True
             else:
                 # Новый сотрудник
-                self.employees[key] = employee_state
+                employee_state = EmployeeState.from_employee_data(emp_data, now)
+                employees[key] = employee_state
                 new_employees.append(employee_state)
 
-        # Находим удаленных сотрудников
-        removed_keys = set(self.employees.keys()) - current_keys
-        removed_employees = [self.employees[key] for key in removed_keys]
+        # Находим и удаляем отсутствующих сотрудников
+        removed_employees = [employees.pop(key) for key in employees.keys() - current_keys]
 
-        # Удаляем отсутствующих сотрудников
-        for key in removed_keys:
-            del self.employees[key]
+        if new_employees or removed_employees:
+            self.dirty = True
 
         return new_employees, removed_employees
 
@@ -156,6 +243,19 @@ class MedicalMonitor:
 
         # Время последнего ежедневного отчета
         self.last_daily_report = None
+        # Сигнатура содержимого последнего отчета: неизменившийся отчет не отправляется целиком
+        self._last_report_sig = None
+
+        # Сбрасывается, если не удалось подключиться к Telegram
+        self.enabled = True
+
+        # Время ежедневного отчета в минутах от начала суток
+        self._report_hhmm = config.report_time_obj.hour * 60 + config.report_time_obj.minute
+
+        # Неизменные фрагменты сообщений собираются один раз
+        self._monitor_header = f"<b>Монитор:</b> {config.name}\n"
+        self._report_time_line = f"<b>Время отчета:</b> {config.daily_report_time}\n\n"
+        self._report_footer = f"\n\n⏰ <i>Следующий отчет: завтра в {config.daily_report_time}</i>"
 
         logging.info(f"Инициализирован монитор: {config.name}")
 
@@ -175,9 +275,11 @@ class MedicalMonitor:
         try:
             now = datetime.now()
             # 1. Получение данных из Google Sheets
+            # Отчёт и внеплановая проверка не должны строиться по данным прошлой проверки
             raw_data = self.google_client.get_worksheet_data(
                 self.config.spreadsheet_id,
-                self.config.worksheet_name
+                self.config.worksheet_name,
+                revalidate=force_daily_report is not False
             )
 
             if not raw_data:
@@ -190,10 +292,10 @@ class MedicalMonitor:
                 return {'error': 'Нет данных о сотрудниках'}
 
             # 3. Классификация сотрудников по срокам
-            expired, critical, no_medical = self._classify_employees(employees)
+            expired, critical, no_medical, keys = self._classify_employees(employees)
 
             # 4. Обновление состояния и поиск новых сотрудников
-            new_employees, removed_employees = self.state_manager.update_employees(employees)
+            new_employees, removed_employees = self.state_manager.update_employees(employees, keys)
 
             # 5. Проверка необходимости отправки уведомлений
             result = {
@@ -206,6 +308,12 @@ class MedicalMonitor:
                 'status': 'success'
             }
 
+            # Сообщения ставятся в очередь отправки сразу, их доставки ждём после сохранения состояния
+            pending: List[Future] = []
+            # Сигнатура полного отчета запоминается только после его доставки
+            report_futures: List[Future] = []
+            report_sig = None
+
             # 6. Отправка уведомлений о новых сотрудниках
             # В полночь (час == 0) не шлём длинный список — только общее сообщение об обновлении данных
             if self.config.send_new_employee_notifications and new_employees:
@@ -215,19 +323,23 @@ class MedicalMonitor:
                         "подробное уведомление пропущено (ночное обновление)"
                     )
                 else:
-                    self._send_new_employee_notification(new_employees)
+                    pending += self._send_new_employee_notification(new_employees)
 
             # 7. Отправка ежедневного отчёта только раз в день в указанное время
-            if force_daily_report is True or (force_daily_report is None and self._should_send_daily_report()):
+            if force_daily_report is True or (force_daily_report is None and self._should_send_daily_report(now)):
                 # В полночь не присылаем большой отчёт со списками — только короткое сообщение об обновлении
                 if now.hour == 0:
-                    self.send_data_updated_message()
+                    pending += self.send_data_updated_message_async()
                 else:
-                    self._send_daily_report(expired, critical, no_medical)
+                    report_futures, report_sig = self._send_daily_report(expired, critical, no_medical)
+                    pending += report_futures
                 self.last_daily_report = now.date()
 
-            # 8. Сохранение состояния
+            # 8. Сохранение состояния (пока сообщения отправляются)
             self.state_manager.save()
+            self.telegram_bot.wait_sent(pending)
+            if report_sig is not None and self.telegram_bot.wait_sent(report_futures):
+                self._last_report_sig = report_sig
 
             logging.info(f"Проверка завершена: {len(employees)} сотрудников, "
                          f"{len(expired)} просрочено, {len(critical)} критических, "
@@ -239,46 +351,54 @@ class MedicalMonitor:
             logging.error(f"Ошибка при проверке: {e}")
             return {'error': str(e), 'status': 'error'}
 
-    def _classify_employees(self, employees: List[Dict[str, Any]]) -> Tuple[List, List, List]:
-        """Классификация сотрудников по срокам"""
+    def _classify_employees(self, employees: List[Employee]) -> Tuple[List, List, List, List]:
+        """
+        Классификация сотрудников по срокам за один проход
+
+        Returns:
+            Tuple: (просрочено, критические, без медкнижки, ключи сотрудников для StateManager)
+        """
         expired = []
         critical = []
         no_medical = []
+        keys = []
 
-        for emp in employees:
-            if not emp['has_medical_book']:
-                no_medical.append(emp)
-            elif emp['days_left'] < 0:
-                expired.append(emp)
-            elif emp['days_left'] <= 30:
-                critical.append(emp)
-
-        return expired, critical, no_medical
+        # Локальные ссылки на методы экономят поиск атрибутов в цикле
+        expired_append = expired.append
+        critical_append = critical.append
+        no_medical_append = no_medical.append
+        keys_append = keys.append
 
-    def _should_send_daily_report(self) -> bool:
-        """Проверка, нужно ли отправлять ежедневный отчет"""
-        current_time = datetime.now().time()
-        current_date = datetime.now().date()
+        # Векторизация через numpy здесь не окупается: заполнение массивов из списка
+        # Employee - такой же проход по строкам, а ключи и списки всё равно нужны в Python
+        for emp in employees:
+            days_left = emp.days_left
+            has_medical_book = emp.has_medical_book
+            keys_append((emp.name, days_left, has_medical_book))
 
-        # Если отчет уже отправлен сегодня - пропускаем
-        if self.last_daily_report == current_date:
-            return False
+            if not has_medical_book:
+                no_medical_append(emp)
+            elif days_left < 0:
+                expired_append(emp)
+            elif days_left <= 30:
+                critical_append(emp)
 
-        # Проверяем, наступило ли время отчета
-        if (current_time.hour == self.config.report_time_obj.hour and
-                current_time.minute == self.config.report_time_obj.minute):
-            return True
+        return expired, critical, no_medical, keys
 
-        return False
+    def _should_send_daily_report(self, now: datetime) -> bool:
+        """Проверка, нужно ли отправлять ежедневный отчет"""
+        # Наступило ли время отчета и не отправлен ли он уже сегодня
+        return now.hour * 60 + now.minute == self._report_hhmm and self.last_daily_report != now.date()
 
-    def _send_new_employee_notification(self, new_employees: List[EmployeeState]):
-        """Отправка уведомления о новых сотрудниках.
+    def _send_new_employee_notification(self, new_employees: List[EmployeeState]) -> List[Future]:
+        """Постановка в очередь уведомлений о новых сотрудниках.
 
         Для каждого нового сотрудника отправляем отдельное короткое сообщение,
         без общего большого списка.
         """
+        futures = []
         if not new_employees:
-            return
+            return futures
 
         for employee in new_employees:
             status_emoji = "❌" if not employee.has_medical_book else "⚠️"
@@ -288,89 +408,124 @@ class MedicalMonitor:
                 else f"Осталось дней: {employee.days_left}"
             )
 
-            message = (
-                "🆕 <b>НОВЫЙ СОТРУДНИК ВНЕСЕН В ТАБЛИЦУ</b>\n\n"
-                f"<b>Монитор:</b> {self.config.name}\n\n"
-                f"{status_emoji} <b>{employee.name}</b>\n"
-            )
+            parts = [
+                "🆕 <b>НОВЫЙ СОТРУДНИК ВНЕСЕН В ТАБЛИЦУ</b>\n\n",
+                self._monitor_header,
+                "\n",
+                f"{status_emoji} <b>{employee.name}</b>\n",
+            ]
             if employee.position:
-                message += f"💼 {employee.position}\n"
+                parts.append(f"💼 {employee.position}\n")
 
-            message += f"📅 {status_text}\n\n"
-            message += f"⏰ Время добавления: {datetime.now().strftime('%d.%m.%Y %H:%M')}"
+            parts.append(f"📅 {status_text}\n\n")
+            parts.append(f"⏰ Время добавления: {datetime.now().strftime('%d.%m.%Y %H:%M')}")
+            message = "".join(parts)
 
-            self.telegram_bot.send_message(message)
+            futures += self.telegram_bot.send_message_async(message)
 
         logging.info(f"Отправлено уведомление о {len(new_employees)} новых сотрудниках")
+        return futures
+
+    def _send_daily_report(self, expired: List, critical: List,
+                           no_medical: List) -> Tuple[List[Future], Optional[int]]:
+        """
+        Постановка ежедневного отчета в очередь отправки
 
-    def _send_daily_report(self, expired: List, critical: List, no_medical: List):
-        """Отправка ежедневного отчета"""
-        message = f"📊 <b>ЕЖЕДНЕВНЫЙ ОТЧЕТ ПО МЕДИЦИНСКИМ КНИЖКАМ</b>\n\n"
-        message += f"<b>Дата:</b> {datetime.now().strftime('%d.%m.%Y')}\n"
-        message += f"<b>Монитор:</b> {self.config.name}\n"
-        message += f"<b>Время отчета:</b> {self.config.daily_report_time}\n\n"
+        Returns:
+            Tuple: (Future отправки, сигнатура полного отчета или None, если отчет не изменился)
+        """
+        parts = [f"📊 <b>ЕЖЕДНЕВНЫЙ ОТЧЕТ ПО МЕДИЦИНСКИМ КНИЖКАМ</b>\n\n"]
+        append = parts.append
+        append(f"<b>Дата:</b> {datetime.now().strftime('%d.%m.%Y')}\n")
+        append(self._monitor_header)
+        append(self._report_time_line)
 
         # Статистика
         total_problematic = len(expired) + len(critical) + len(no_medical)
+        employee_count = self.state_manager.get_employee_count()
+
+        # Если проблемных сотрудников нет и отчет не изменился - отправляем только короткое сообщение.
+        # Списки просроченных и критических сроков отправляются каждый день полностью
+        report_sig = hash((
+            tuple((emp.name, emp.days_left) for emp in expired),
+            tuple((emp.name, emp.days_left) for emp in critical),
+            tuple(emp.name for emp in no_medical),
+            employee_count
+        ))
+        if total_problematic == 0 and report_sig == self._last_report_sig:
+            append("Без изменений с предыдущего отчета.")
+            append(self._report_footer)
+            futures = self.telegram_bot.send_message_async("".join(parts))
+            logging.info(f"Ежедневный отчет не изменился, отправлено короткое сообщение: {self.config.name}")
+            return futures, None
 
         if total_problematic == 0:
-            message += "✅ <b>Все медицинские книжки в порядке!</b>\n"
-            message += "Нет сотрудников с проблемными сроками или без медкнижек.\n"
+            append("✅ <b>Все медицинские книжки в порядке!</b>\n")
+            append("Нет сотрудников с проблемными сроками или без медкнижек.\n")
         else:
-            message += f"⚠️ <b>Требуют внимания:</b> {total_problematic} сотрудников\n\n"
+            append(f"⚠️ <b>Требуют внимания:</b> {total_problematic} сотрудников\n\n")
 
             if no_medical:
-                message += "🔴 <b>БЕЗ МЕДИЦИНСКОЙ КНИЖКИ:</b>\n"
-                for i, emp in enumerate(no_medical[:5], 1):
-                    message += f"{i}. ❌ {emp['name']}\n"
-                    if emp.get('position'):
-                        message += f"   💼 {emp['position']}\n"
+                append("🔴 <b>БЕЗ МЕДИЦИНСКОЙ КНИЖКИ:</b>\n")
+                append("".join([
+                    f"{i}. ❌ {emp.name}\n"
+                    + (f"   💼 {emp.position}\n" if emp.position else "")
+                    for i, emp in enumerate(islice(no_medical, 5), 1)
+                ]))
                 if len(no_medical) > 5:
-                    message += f"   ...и еще {len(no_medical) - 5}\n"
-                message += "\n"
+                    append(f"   ...и еще {len(no_medical) - 5}\n")
+                append("\n")
 
             if expired:
-                message += "🔴 <b>ПРОСРОЧЕНО:</b>\n"
-                for i, emp in enumerate(expired[:5], 1):
-                    message += f"{i}. ❌ {emp['name']}\n"
-                    message += f"   📅 Просрочено: {abs(emp['days_left'])} дней\n"
-                    if emp.get('position'):
-                        message += f"   💼 {emp['position']}\n"
+                append("🔴 <b>ПРОСРОЧЕНО:</b>\n")
+                append("".join([
+                    f"{i}. ❌ {emp.name}\n"
+                    f"   📅 Просрочено: {abs(emp.days_left)} дней\n"
+                    + (f"   💼 {emp.position}\n" if emp.position else "")
+                    for i, emp in enumerate(islice(expired, 5), 1)
+                ]))
                 if len(expired) > 5:
-                    message += f"   ...и еще {len(expired) - 5}\n"
-                message += "\n"
+                    append(f"   ...и еще {len(expired) - 5}\n")
+                append("\n")
 
             if critical:
-                message += "🟠 <b>КРИТИЧЕСКИЕ СРОКИ (≤30 дней):</b>\n"
-                for i, emp in enumerate(critical[:5], 1):
-                    days = emp['days_left']
-                    emoji = "🔴" if days <= 7 else "🟠"
-                    message += f"{i}. {emoji} {emp['name']}\n"
-                    message += f"   📅 Осталось: {days} дней\n"
-                    if emp.get('position'):
-                        message += f"   💼 {emp['position']}\n"
+                append("🟠 <b>КРИТИЧЕСКИЕ СРОКИ (≤30 дней):</b>\n")
+                append("".join([
+                    f"{i}. {'🔴' if emp.days_left <= 7 else '🟠'} {emp.name}\n"
+                    f"   📅 Осталось: {emp.days_left} дней\n"
+                    + (f"   💼 {emp.position}\n" if emp.position else "")
+                    for i, emp in enumerate(islice(critical, 5), 1)
+                ]))
                 if len(critical) > 5:
-                    message += f"   ...и еще {len(critical) - 5}\n"
-                message += "\n"
+                    append(f"   ...и еще {len(critical) - 5}\n")
+                append("\n")
 
-        message += f"\n📈 <b>Всего сотрудников в системе:</b> {self.state_manager.get_employee_count()}"
-        message += f"\n\n⏰ <i>Следующий отчет: завтра в {self.config.daily_report_time}</i>"
+        append(f"\n📈 <b>Всего сотрудников в системе:</b> {employee_count}")
+        append(self._report_footer)
 
-        self.telegram_bot.send_message(message)
+        message = "".join(parts)
+
+        futures = self.telegram_bot.send_message_async(message)
         logging.info(f"Отправлен ежедневный отчет: {total_problematic} проблемных сотрудников")
+        return futures, report_sig
 
-    def send_data_updated_message(self):
+    def send_data_updated_message(self) -> bool:
         """Отправка короткого сообщения об обновлении данных (без отчёта со списком сотрудников)."""
+        return self.telegram_bot.wait_sent(self.send_data_updated_message_async())
+
+    def send_data_updated_message_async(self) -> List[Future]:
+        """Постановка сообщения об обновлении данных в очередь отправки без ожидания"""
         message = (
             f"🔄 <b>Обновление данных</b>\n\n"
-            f"<b>Монитор:</b> {self.config.name}\n"
+            f"{self._monitor_header}"
             f"⏰ {datetime.now().strftime('%d.%m.%Y %H:%M')}\n\n"
             f"Данные из таблицы успешно обновлены."
         )
-        self.telegram_bot.send_message(message)
+        futures = self.telegram_bot.send_message_async(message)
         logging.info(f"Отправлено сообщение об обновлении данных для монитора: {self.config.name}")
+        return futures
 
-    def send_immediate_alert(self, employee: Dict[str, Any], alert_type: str):
+    def send_immediate_alert(self, employee: Employee, alert_type: str):
         """
         Отправка немедленного уведомления
 
@@ -393,21 +548,24 @@ class MedicalMonitor:
         title = alert_titles.get(alert_type, 'УВЕДОМЛЕНИЕ')
         emoji = emojis.get(alert_type, '⚠️')
 
-        message = f"{emoji} <b>{title}</b>\n\n"
-        message += f"<b>Монитор:</b> {self.config.name}\n\n"
-        message += f"<b>Сотрудник:</b> {employee['name']}\n"
+        parts = [f"{emoji} <b>{title}</b>\n\n"]
+        parts.append(self._monitor_header)
+        parts.append("\n")
+        parts.append(f"<b>Сотрудник:</b> {employee.name}\n")
 
-        if employee.get('position'):
-            message += f"<b>Должность:</b> {employee['position']}\n"
+        if employee.position:
+            parts.append(f"<b>Должность:</b> {employee.position}\n")
 
         if alert_type == 'expired':
-            message += f"<b>Статус:</b> Просрочено на {abs(employee['days_left'])} дней\n"
+            parts.append(f"<b>Статус:</b> Просрочено на {abs(employee.days_left)} дней\n")
         elif alert_type == 'critical':
-            message += f"<b>Статус:</b> Осталось {employee['days_left']} дней\n"
+            parts.append(f"<b>Статус:</b> Осталось {employee.days_left} дней\n")
         elif alert_type == 'no_medical':
-            message += f"<b>Статус:</b> Отсутствует медицинская книжка\n"
+            parts.append(f"<b>Статус:</b> Отсутствует медицинская книжка\n")
+
+        parts.append(f"\n⏰ Обнаружено: {datetime.now().strftime('%d.%m.%Y %H:%M')}")
 
-        message += f"\n⏰ Обнаружено: {datetime.now().strftime('%d.%m.%Y %H:%M')}"
+        message = "".join(parts)
 
         self.telegram_bot.send_message(message)
-        logging.info(f"Отправлен немедленный алерт: {employee['name']} - {alert_type}")
\ No newline at end of file
+        logging.info(f"Отправлен немедленный алерт: {employee.name} - {alert_type}")
\ No newline at end of file
@@ -1,9 +1,8 @@
 import schedule
-import time  # Этот импорт уже был, убедитесь, что он есть
 import threading
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import logging
-from typing import List
+from typing import List, Dict, Any, Optional
 
 
 class MonitorScheduler:
@@ -13,6 +12,12 @@ class MonitorScheduler:
         self.monitors = monitors
         self.running = False
         self.schedule_thread = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        # Прерывает ожидание следующей задачи при остановке
+        self._stop_event = threading.Event()
+
+        # Не более одной проверки монитора одновременно
+        self._check_locks = {monitor: threading.Lock() for monitor in monitors}
 
     def start(self):
         """Запуск планировщика"""
@@ -21,18 +26,23 @@ class MonitorScheduler:
             return
 
         self.running = True
+        self._stop_event.clear()
+
+        # Проверки разных мониторов выполняются параллельно и не задерживают друг друга
+        self._pool = ThreadPoolExecutor(max_workers=max(1, len(self.monitors)),
+                                        thread_name_prefix="MonitorCheck")
 
         # Настройка расписания для каждого монитора
         for monitor in self.monitors:
             report_time = monitor.config.daily_report_time
             # Ежедневный отчёт только в указанное время (раз в день)
             schedule.every().day.at(report_time).do(
-                self._run_daily_report, monitor
+                self._submit, self._run_daily_report, monitor
             ).tag('daily_report', monitor.config.name)
 
             # Периодические проверки — только обновление состояния, без отправки отчёта в ТГ
             schedule.every(monitor.config.check_interval).minutes.do(
-                self._run_monitor_check, monitor
+                self._submit, self._run_monitor_check, monitor
             ).tag('regular_check', monitor.config.name)
 
             logging.info(f"Настроен монитор '{monitor.config.name}': "
@@ -47,24 +57,48 @@ class MonitorScheduler:
     def stop(self):
         """Остановка планировщика"""
         self.running = False
+        self._stop_event.set()
         schedule.clear()
 
         if self.schedule_thread and self.schedule_thread.is_alive():
             self.schedule_thread.join(timeout=5)
 
+        pool, self._pool = self._pool, None
+        if pool:
+            # Ожидающие запуска проверки отменяем, а выполняющиеся дожидаемся:
+            # их состояние должно попасть в очередь записи до закрытия StateManager
+            pool.shutdown(wait=True, cancel_futures=True)
+
         logging.info("Планировщик остановлен")
 
     def _run_scheduler(self):
-        """Основной цикл планировщика"""
+        """Основной цикл планировщика: спим ровно до ближайшей задачи"""
         while self.running:
+            idle = schedule.idle_seconds()
+            if idle is None:  # Задач нет - проверяем раз в минуту
+                idle = 60
+            if idle > 0 and self._stop_event.wait(timeout=idle):
+                break
             schedule.run_pending()
-            time.sleep(60)  # Проверяем каждую минуту
+
+    def _submit(self, job, monitor):
+        """Передача задачи монитора в пул, чтобы не блокировать поток расписания"""
+        pool = self._pool
+        if pool is None:  # Планировщик остановлен
+            return
+        try:
+            pool.submit(job, monitor)
+        except RuntimeError:  # Пул остановлен между проверкой и постановкой задачи
+            logging.debug("Планировщик остановлен, задача %s не запущена", monitor.config.name)
 
     def _run_daily_report(self, monitor):
         """Запуск проверки и отправка ежедневного отчёта в ТГ (только в указанное время)."""
+        if not monitor.enabled:
+            return
         try:
             logging.info(f"Запуск ежедневного отчёта для монитора: {monitor.config.name}")
-            result = monitor.check_medical_records(force_daily_report=True)
+            # Отчёт нельзя пропустить - ждём завершения текущей проверки
+            result = self._run_exclusive(monitor, force_daily_report=True, wait=True)
             if result.get('status') == 'error':
                 logging.error(f"Ошибка при ежедневном отчёте {monitor.config.name}: {result.get('error')}")
         except Exception as e:
@@ -72,20 +106,42 @@ class MonitorScheduler:
 
     def _run_monitor_check(self, monitor):
         """Периодическая проверка без отправки отчёта в ТГ (только обновление состояния)."""
+        if not monitor.enabled:
+            return
         try:
-            logging.debug(f"Запуск плановой проверки для монитора: {monitor.config.name}")
-            result = monitor.check_medical_records(force_daily_report=False)
-            if result.get('status') == 'error':
+            logging.debug("Запуск плановой проверки для монитора: %s", monitor.config.name)
+            result = self._run_exclusive(monitor, force_daily_report=False, wait=False)
+            if result is not None and result.get('status') == 'error':
                 logging.error(f"Ошибка при проверке {monitor.config.name}: {result.get('error')}")
         except Exception as e:
             logging.error(f"Необработанная ошибка в проверке {monitor.config.name}: {e}")
 
+    def _run_exclusive(self, monitor, force_daily_report: bool, wait: bool) -> Optional[Dict[str, Any]]:
+        """
+        Проверка монитора, если другая его проверка не выполняется.
+
+        Args:
+            wait: Ждать завершения текущей проверки; иначе пропустить запуск
+
+        Returns:
+            Результат проверки или None, если запуск пропущен
+        """
+        lock = self._check_locks[monitor]
+        if not lock.acquire(blocking=wait):
+            logging.warning(f"Предыдущая проверка монитора {monitor.config.name} ещё выполняется, запуск пропущен")
+            return None
+
+        try:
+            return monitor.check_medical_records(force_daily_report=force_daily_report)
+        finally:
+            lock.release()
+
     def run_immediate_check(self, monitor_index: int = 0):
         """Немедленная проверка для указанного монитора"""
         if 0 <= monitor_index < len(self.monitors):
             monitor = self.monitors[monitor_index]
             logging.info(f"Запуск немедленной проверки для {monitor.config.name}")
-            return monitor.check_medical_records()
+            return self._run_exclusive(monitor, force_daily_report=None, wait=True)
         return None
 
     def get_scheduled_jobs(self):
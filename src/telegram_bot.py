@@ -1,6 +1,118 @@
 import requests
-from typing import List, Optional
+import http_pool
+import json_codec
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Dict, List
 import logging
+import queue
+import threading
+import time
+
+
+class RateLimiter:
+    """Ограничение частоты: не более burst_limit вызовов за time_limit_ms миллисекунд"""
+
+    def __init__(self, burst_limit: int = 30, time_limit_ms: int = 1000):
+        self.burst_limit = burst_limit
+        self.time_limit = time_limit_ms / 1000
+        self._call_times = deque()  # Время последних вызовов в пределах окна
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Ожидание, пока в окне time_limit не освободится место"""
+        with self._lock:
+            now = time.monotonic()
+            while self._call_times and now - self._call_times[0] >= self.time_limit:
+                self._call_times.popleft()
+
+            if len(self._call_times) >= self.burst_limit:
+                time.sleep(self.time_limit - (now - self._call_times.popleft()))
+                now = time.monotonic()
+
+            self._call_times.append(now)
+
+
+class DelayQueue:
+    """
+    Очередь вызовов с ограничением частоты: не более burst_limit вызовов
+    за time_limit_ms миллисекунд. Вызовы выполняются по порядку в отдельном потоке.
+    """
+
+    def __init__(self, burst_limit: int = 30, time_limit_ms: int = 1000, name: str = "DelayQueue"):
+        self._limiter = RateLimiter(burst_limit, time_limit_ms)
+        self._queue = queue.Queue()
+
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def __call__(self, func: Callable, *args, **kwargs):
+        """Постановка вызова в очередь"""
+        self._queue.put((func, args, kwargs))
+
+    def _run(self):
+        while True:
+            func, args, kwargs = self._queue.get()
+            self._limiter.wait()
+            try:
+                func(*args, **kwargs)
+            except Exception as e:
+                logging.error(f"Ошибка в очереди отправки: {e}")
+
+
+class MessageQueue:
+    """
+    Очередь исходящих сообщений с лимитами Telegram:
+    общий лимит (30 сообщений в секунду) и лимит на чат (20 сообщений в минуту).
+    Каждый чат обслуживается своим потоком: сообщения в один чат уходят по порядку,
+    а в разные чаты - параллельно.
+    """
+
+    def __init__(self, all_burst_limit: int = 30, all_time_limit_ms: int = 1000,
+                 chat_burst_limit: int = 20, chat_time_limit_ms: int = 60000):
+        self.chat_burst_limit = chat_burst_limit
+        self.chat_time_limit_ms = chat_time_limit_ms
+
+        # Общий лимит для всех чатов; потоки очередей чатов создаются при первой отправке
+        self._all_limiter = RateLimiter(all_burst_limit, all_time_limit_ms)
+        self._chat_queues: Dict[str, DelayQueue] = {}
+        self._lock = threading.Lock()
+
+    def put(self, chat_id: str, func: Callable, *args, **kwargs) -> Future:
+        """
+        Постановка отправки в очередь
+
+        Returns:
+            Future: Результат func после отправки
+        """
+        future = Future()
+
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            # Сначала ограничение чата (в очереди чата), затем общее ограничение
+            self._all_limiter.wait()
+            try:
+                future.set_result(func(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+
+        self._get_chat_queue(chat_id)(run)
+        return future
+
+    def _get_chat_queue(self, chat_id: str) -> DelayQueue:
+        with self._lock:
+            chat_queue = self._chat_queues.get(chat_id)
+            if chat_queue is None:
+                chat_queue = DelayQueue(self.chat_burst_limit, self.chat_time_limit_ms,
+                                        name=f"MessageQueue-{chat_id}")
+                self._chat_queues[chat_id] = chat_queue
+
+            return chat_queue
+
+
+# Общая очередь для всех ботов: лимиты соблюдаются независимо от числа мониторов
+message_queue = MessageQueue()
 
 
 class TelegramBot:
@@ -10,6 +122,12 @@ class TelegramBot:
         self.bot_token = bot_token
         self.chat_ids = chat_ids
         self.base_url = f"https://api.telegram.org/bot{bot_token}"
+        self.send_url = f"{self.base_url}/sendMessage"
+
+        # Сессия с общим пулом keep-alive соединений: TLS-рукопожатие не повторяется для каждого чата
+        self.session = http_pool.mount(requests.Session())
+        # Тело запросов отправляется уже сериализованным, тип содержимого задаём один раз
+        self.session.headers['Content-Type'] = 'application/json'
 
     def send_message(self, text: str, parse_mode: str = "HTML",
                      disable_web_page_preview: bool = True) -> bool:
@@ -24,40 +142,59 @@ class TelegramBot:
         Returns:
             bool: Успешность отправки
         """
+        return self.wait_sent(self.send_message_async(text, parse_mode, disable_web_page_preview))
+
+    def send_message_async(self, text: str, parse_mode: str = "HTML",
+                           disable_web_page_preview: bool = True) -> List[Future]:
+        """
+        Постановка сообщения в очередь отправки во все чаты без ожидания
+
+        Returns:
+            List[Future]: По одному Future[bool] на каждый чат
+        """
         if not self.chat_ids:
             logging.warning("Нет chat_id для отправки сообщений")
-            return False
+            return []
 
-        success_count = 0
+        return [
+            message_queue.put(chat_id, self._send_to_chat, chat_id, text, parse_mode, disable_web_page_preview)
+            for chat_id in self.chat_ids
+        ]
 
-        for chat_id in self.chat_ids:
-            try:
-                url = f"{self.base_url}/sendMessage"
-                payload = {
-                    'chat_id': chat_id,
-                    'text': text,
-                    'parse_mode': parse_mode,
-                    'disable_web_page_preview': disable_web_page_preview
-                }
-
-                response = requests.post(url, json=payload, timeout=10)
-
-                if response.status_code == 200:
-                    success_count += 1
-                    logging.debug(f"Сообщение отправлено в чат {chat_id}")
-                else:
-                    logging.error(f"Ошибка отправки в чат {chat_id}: {response.status_code}")
+    @staticmethod
+    def wait_sent(futures: List[Future]) -> bool:
+        """Ожидание отправки; True, если сообщение ушло хотя бы в один чат"""
+        return sum(future.result() for future in futures) > 0
 
-            except Exception as e:
-                logging.error(f"Ошибка при отправке в чат {chat_id}: {e}")
+    def _send_to_chat(self, chat_id: str, text: str, parse_mode: str,
+                      disable_web_page_preview: bool) -> bool:
+        """Отправка сообщения в один чат"""
+        try:
+            payload = {
+                'chat_id': chat_id,
+                'text': text,
+                'parse_mode': parse_mode,
+                'disable_web_page_preview': disable_web_page_preview
+            }
+
+            response = self.session.post(self.send_url, data=json_codec.dumps(payload), timeout=10)
+
+            if response.status_code == 200:
+                logging.debug("Сообщение отправлено в чат %s", chat_id)
+                return True
+
+            logging.error(f"Ошибка отправки в чат {chat_id}: {response.status_code}")
 
-        return success_count > 0
+        except Exception as e:
+            logging.error(f"Ошибка при отправке в чат {chat_id}: {e}")
+
+        return False
 
     def test_connection(self) -> bool:
         """Тестирование подключения к боту"""
         try:
             url = f"{self.base_url}/getMe"
-            response = requests.get(url, timeout=5)
+            response = self.session.get(url, timeout=5)
 
             if response.status_code == 200:
                 bot_info = response.json()
@@ -73,5 +210,9 @@ class TelegramBot:
 
     def send_test_message(self) -> bool:
         """Отправка тестового сообщения"""
+        return self.wait_sent(self.send_test_message_async())
+
+    def send_test_message_async(self) -> List[Future]:
+        """Постановка тестового сообщения в очередь отправки без ожидания"""
         test_text = "✅ <b>Тестовое сообщение</b>\nСистема мониторинга медицинских книжек работает!"
-        return self.send_message(test_text)
\ No newline at end of file
+        return self.send_message_async(test_text)